@@ -2,131 +2,85 @@
 """FastMCP time server + flexible GitHub repo tools (read/write/list/delete via PAT) + Render deploy hook."""
 from __future__ import annotations
 
-import base64
+import asyncio
+import atexit
+import binascii
+import json
 import os
-from datetime import datetime, timezone
+import random
+import time
+from datetime import datetime
 from typing import Optional, Dict, Any, List
-from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import httpx
 from fastmcp import FastMCP
 
-__all__ = ["app", "mcp"]
+try:
+    from orjson import dumps as _orjson_dumps, loads as _json_loads  # 2-5x schneller bei Multi-MB-Trees
+except ImportError:  # pragma: no cover
+    _orjson_dumps = None
+    _json_loads = json.loads
 
-mcp = FastMCP("time-mcp-server")
+from time_data import CITY_TO_TZ, _resolve_timezone
+
+__all__ = ["app", "create_app", "mcp"]
+
+def _tool_serializer(data: Any) -> str:
+    # Serialisiert Nicht-String-Tool-Ergebnisse; bei github_list_tree auf
+    # großen Repos dominiert dieser Schritt den Response-Pfad.
+    if _orjson_dumps is not None:
+        return _orjson_dumps(data).decode()
+    return json.dumps(data)
+
+mcp = FastMCP("time-mcp-server", tool_serializer=_tool_serializer)
 
 # =========================
 # Time / TZ helpers
 # =========================
 
-CITY_TO_TZ: Dict[str, str] = {
-    # DACH
-    "berlin": "Europe/Berlin",
-    "münchen": "Europe/Berlin",
-    "munich": "Europe/Berlin",
-    "hamburg": "Europe/Berlin",
-    "köln": "Europe/Berlin",
-    "cologne": "Europe/Berlin",
-    "frankfurt": "Europe/Berlin",
-    "stuttgart": "Europe/Berlin",
-    "leipzig": "Europe/Berlin",
-    "dresden": "Europe/Berlin",
-    "zürich": "Europe/Zurich",
-    "zurich": "Europe/Zurich",
-    "wien": "Europe/Vienna",
-    "vienna": "Europe/Vienna",
-    # Europa
-    "madrid": "Europe/Madrid",
-    "barcelona": "Europe/Madrid",
-    "paris": "Europe/Paris",
-    "london": "Europe/London",
-    "dublin": "Europe/Dublin",
-    "lisbon": "Europe/Lisbon",
-    "roma": "Europe/Rome",
-    "rome": "Europe/Rome",
-    "milano": "Europe/Rome",
-    "milan": "Europe/Rome",
-    "prague": "Europe/Prague",
-    "praha": "Europe/Prague",
-    "budapest": "Europe/Budapest",
-    "warsaw": "Europe/Warsaw",
-    "moscow": "Europe/Moscow",
-    "moskau": "Europe/Moscow",
-    "st. petersburg": "Europe/Moscow",
-    "istanbul": "Europe/Istanbul",
-    "athens": "Europe/Athens",
-    "oslo": "Europe/Oslo",
-    "stockholm": "Europe/Stockholm",
-    "helsinki": "Europe/Helsinki",
-    # Nordamerika
-    "new york": "America/New_York",
-    "nyc": "America/New_York",
-    "chicago": "America/Chicago",
-    "denver": "America/Denver",
-    "los angeles": "America/Los_Angeles",
-    "la": "America/Los_Angeles",
-    "san francisco": "America/Los_Angeles",
-    "toronto": "America/Toronto",
-    "mexico city": "America/Mexico_City",
-    # Südamerika
-    "são paulo": "America/Sao_Paulo",
-    "sao paulo": "America/Sao_Paulo",
-    "buenos aires": "America/Argentina/Buenos_Aires",
-    "santiago": "America/Santiago",
-    "bogotá": "America/Bogota",
-    "bogota": "America/Bogota",
-    "lima": "America/Lima",
-    # Asien
-    "tokyo": "Asia/Tokyo",
-    "seoul": "Asia/Seoul",
-    "shanghai": "Asia/Shanghai",
-    "beijing": "Asia/Shanghai",
-    "hong kong": "Asia/Hong_Kong",
-    "singapore": "Asia/Singapore",
-    "kolkata": "Asia/Kolkata",
-    "mumbai": "Asia/Kolkata",
-    "delhi": "Asia/Kolkata",
-    "dubai": "Asia/Dubai",
-    "abu dhabi": "Asia/Dubai",
-    # Ozeanien / Afrika
-    "sydney": "Australia/Sydney",
-    "melbourne": "Australia/Melbourne",
-    "auckland": "Pacific/Auckland",
-    "cairo": "Africa/Cairo",
-    "johannesburg": "Africa/Johannesburg",
-    "nairobi": "Africa/Nairobi",
-}
-
-def _normalize_key(s: str) -> str:
-    return s.strip().replace("_", " ").replace("-", " ").casefold()
-
-def _resolve_timezone(timezone_name: Optional[str] = None, city: Optional[str] = None) -> ZoneInfo:
-    if timezone_name:
-        try:
-            return ZoneInfo(timezone_name)
-        except ZoneInfoNotFoundError:
-            pass
-    if city:
-        key = _normalize_key(city)
-        for k in (key, key.replace(".", "")):
-            if k in CITY_TO_TZ:
-                try:
-                    return ZoneInfo(CITY_TO_TZ[k])
-                except ZoneInfoNotFoundError:
-                    break
-    return ZoneInfo("UTC")
+# 1-Sekunden-Cache für den UTC-Pfad mit precision='s': Aufrufe innerhalb
+# derselben Wanduhr-Sekunde teilen sich einen fertig formatierten String.
+_LAST_UTC_SEC: int = -1
+_LAST_UTC_ISO: str = ""
 
 @mcp.tool(
     description=(
         "Gibt die aktuelle Zeit zurück. Ohne Parameter in UTC. "
-        "Optional per IANA-Zeitzone ('Europe/Madrid') oder Städtenamen ('Madrid')."
+        "Optional per IANA-Zeitzone ('Europe/Madrid') oder Städtenamen ('Madrid'). "
+        "precision='s' liefert Sekundengranularität (cachebar), Standard sind Mikrosekunden."
     )
 )
-def current_time(timezone_name: str | None = None, city: str | None = None, as_utc: bool = False) -> str:
-    if as_utc:
-        return datetime.now(timezone.utc).isoformat()
+def current_time(
+    timezone_name: str | None = None,
+    city: str | None = None,
+    as_utc: bool = False,
+    precision: str = "us",
+) -> str:
+    global _LAST_UTC_SEC, _LAST_UTC_ISO
+    if as_utc or (timezone_name is None and city is None):
+        if precision != "s":
+            return _utc_iso_now()
+        sec = time.time_ns() // 1_000_000_000
+        if sec != _LAST_UTC_SEC:
+            tm = time.gmtime(sec)
+            _LAST_UTC_ISO = (
+                f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+                f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}+00:00"
+            )
+            _LAST_UTC_SEC = sec
+        return _LAST_UTC_ISO
     tz = _resolve_timezone(timezone_name=timezone_name, city=city)
-    return datetime.now(tz).isoformat()
+    dt = datetime.now(tz)
+    return dt.isoformat(timespec="seconds") if precision == "s" else dt.isoformat()
+
+def _utc_iso_now() -> str:
+    # Schneller UTC-Pfad: time.gmtime + f-String statt datetime-Objekt + isoformat().
+    s, ns = divmod(time.time_ns(), 1_000_000_000)
+    tm = time.gmtime(s)
+    return (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{ns // 1000:06d}+00:00"
+    )
 
 # =========================
 # GitHub tools (via PAT)
@@ -135,27 +89,115 @@ def current_time(timezone_name: str | None = None, city: str | None = None, as_u
 GITHUB_API_BASE = "https://api.github.com"
 GITHUB_TOKEN_ENV = "GITHUB_TOKEN"
 
+# Ein langlebiger, gepoolter Client pro Token: hält Keep-Alive-Verbindungen zu
+# api.github.com offen, sodass Folge-Requests den TCP/TLS-Handshake überspringen.
+# Async, damit parallele Tool-Aufrufe sich nicht gegenseitig auf GitHub-Latenz blockieren.
+_GH_CLIENT: httpx.AsyncClient | None = None
+_GH_CLIENT_TOKEN: str | None = None
+
+def _close_async_client(client: httpx.AsyncClient) -> None:
+    if not client.is_closed:
+        try:
+            asyncio.run(client.aclose())
+        except RuntimeError:
+            pass  # laufender Event-Loop beim Interpreter-Exit; Sockets schließt das OS
+
+def _close_gh_client() -> None:
+    if _GH_CLIENT is not None:
+        _close_async_client(_GH_CLIENT)
+
+def _get_gh_client(token: str) -> httpx.AsyncClient:
+    global _GH_CLIENT, _GH_CLIENT_TOKEN
+    if _GH_CLIENT is None or _GH_CLIENT_TOKEN != token:
+        _GH_CLIENT = httpx.AsyncClient(
+            timeout=20.0,
+            base_url=GITHUB_API_BASE,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "User-Agent": "mcp-time-server/1.1",
+            },
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            http2=True,
+        )
+        if _GH_CLIENT_TOKEN is None:
+            atexit.register(_close_gh_client)
+        _GH_CLIENT_TOKEN = token
+    return _GH_CLIENT
+
+class _TokenBucket:
+    """Leaky-Bucket-Drossel, abgestimmt auf GitHubs primäres Limit (~5000 Requests/Stunde)."""
+
+    def __init__(self, rate: float, burst: float):
+        self._base_rate = rate
+        self._rate = rate
+        self._capacity = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._reset_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                # Gedrosselte Rate nach dem Quota-Reset wieder freigeben.
+                if self._rate < self._base_rate and time.time() >= self._reset_at:
+                    self._rate = self._base_rate
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self._rate)
+
+    def slow_down(self, reset_epoch: float, remaining: int) -> None:
+        # Kontingent wird knapp: Rate auf Restbudget / Restzeit bis zum Reset
+        # drücken; acquire() stellt die Basisrate nach dem Reset wieder her.
+        window = max(reset_epoch - time.time(), 1.0)
+        self._rate = min(self._rate, max(remaining, 1) / window)
+        self._reset_at = reset_epoch
+
+# Begrenzt gleichzeitige Requests (Sekundärlimits) und die Dauerrate (Primärlimit).
+_GH_SEM = asyncio.Semaphore(64)
+_GH_LIMITER = _TokenBucket(rate=5000 / 3600, burst=50)
+_GH_MAX_RETRIES = 5
+
 class GitHubClient:
     def __init__(self, token: str):
-        self._headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "User-Agent": "mcp-time-server/1.1",
-        }
-
-    def _client(self) -> httpx.Client:
-        return httpx.Client(timeout=20.0, headers=self._headers, base_url=GITHUB_API_BASE)
+        self._client = _get_gh_client(token)
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Gedrosselter Request mit Backoff auf 429/403-Rate-Limit und 5xx."""
+        for attempt in range(_GH_MAX_RETRIES + 1):
+            await _GH_LIMITER.acquire()
+            async with _GH_SEM:
+                r = await self._client.request(method, url, **kwargs)
+            remaining = r.headers.get("X-RateLimit-Remaining")
+            reset = r.headers.get("X-RateLimit-Reset")
+            if remaining is not None and reset is not None and int(remaining) < 100:
+                _GH_LIMITER.slow_down(float(reset), int(remaining))
+            retry_after = r.headers.get("Retry-After")
+            retryable = r.status_code in (429, 500, 502, 503, 504) or (
+                # 403 nur bei Rate-Limit wiederholen, nicht bei echten Berechtigungsfehlern
+                r.status_code == 403 and (retry_after is not None or remaining == "0")
+            )
+            if retryable and attempt < _GH_MAX_RETRIES:
+                delay = float(retry_after) if retry_after is not None else 2 ** attempt + random.random()
+                await asyncio.sleep(delay)
+                continue
+            r.raise_for_status()
+            return r
+        raise RuntimeError("unreachable")  # pragma: no cover
 
     # -------- Contents API (files/dirs) --------
-    def get_content(self, owner: str, repo: str, path: str, ref: Optional[str] = None) -> dict:
+    async def get_content(self, owner: str, repo: str, path: str, ref: Optional[str] = None) -> dict:
         params = {"ref": ref} if ref else None
-        with self._client() as c:
-            r = c.get(f"/repos/{owner}/{repo}/contents/{path}", params=params)
-            r.raise_for_status()
-            return r.json()
+        r = await self._request("GET", f"/repos/{owner}/{repo}/contents/{path}", params=params)
+        return _json_loads(r.content)
 
-    def put_content(
+    async def put_content(
         self,
         owner: str,
         repo: str,
@@ -169,7 +211,9 @@ class GitHubClient:
     ) -> dict:
         payload: Dict[str, Any] = {
             "message": message,
-            "content": base64.b64encode(content_text.encode("utf-8")).decode("ascii"),
+            # b2a_base64 direkt statt base64.b64encode: spart den Wrapper-Overhead
+            # des base64-Moduls bei großen Dateien.
+            "content": binascii.b2a_base64(content_text.encode("utf-8"), newline=False).decode("ascii"),
         }
         if branch:
             payload["branch"] = branch
@@ -179,12 +223,10 @@ class GitHubClient:
             payload["author"] = author
         if committer:
             payload["committer"] = committer
-        with self._client() as c:
-            r = c.put(f"/repos/{owner}/{repo}/contents/{path}", json=payload)
-            r.raise_for_status()
-            return r.json()
+        r = await self._request("PUT", f"/repos/{owner}/{repo}/contents/{path}", json=payload)
+        return _json_loads(r.content)
 
-    def delete_content(
+    async def delete_content(
         self,
         owner: str,
         repo: str,
@@ -198,27 +240,64 @@ class GitHubClient:
             payload["branch"] = branch
         if sha:
             payload["sha"] = sha
-        with self._client() as c:
-            r = c.delete(f"/repos/{owner}/{repo}/contents/{path}", json=payload)
-            r.raise_for_status()
-            return r.json()
+        r = await self._request("DELETE", f"/repos/{owner}/{repo}/contents/{path}", json=payload)
+        return _json_loads(r.content)
+
+    async def get_blob_sha(self, owner: str, repo: str, path: str, ref: Optional[str] = None) -> Optional[str]:
+        """Ermittelt die Blob-SHA ohne den Dateiinhalt herunterzuladen.
+
+        HEAD auf die Contents API mit Raw-Media-Type: das ETag entspricht dort
+        der Blob-SHA, es wird also kein (Base64-)Body übertragen.
+        """
+        params = {"ref": ref} if ref else None
+        r = await self._request(
+            "HEAD",
+            f"/repos/{owner}/{repo}/contents/{path}",
+            params=params,
+            headers={"Accept": "application/vnd.github.raw+json"},
+        )
+        sha = r.headers.get("ETag", "").removeprefix("W/").strip('"')
+        return sha if len(sha) == 40 else None
+
+    async def get_raw(self, url: str) -> str:
+        """Lädt einen Blob gestreamt über seine Raw-URL (raw.githubusercontent.com)."""
+        chunks: List[bytes] = []
+        await _GH_LIMITER.acquire()
+        async with _GH_SEM:
+            async with self._client.stream("GET", url) as r:
+                r.raise_for_status()
+                async for chunk in r.aiter_bytes():
+                    chunks.append(chunk)
+        return b"".join(chunks).decode("utf-8", errors="replace")
 
     # -------- Trees API (recursive listing) --------
-    def get_tree(self, owner: str, repo: str, tree_sha_or_ref: str, recursive: bool = True) -> dict:
+    async def get_tree(self, owner: str, repo: str, tree_sha_or_ref: str, recursive: bool = True) -> dict:
         params = {"recursive": "1"} if recursive else None
-        with self._client() as c:
-            r = c.get(f"/repos/{owner}/{repo}/git/trees/{tree_sha_or_ref}", params=params)
-            r.raise_for_status()
-            return r.json()
+        r = await self._request("GET", f"/repos/{owner}/{repo}/git/trees/{tree_sha_or_ref}", params=params)
+        return _json_loads(r.content)
+
+# Token und Client-Instanz werden beim ersten Tool-Aufruf aufgelöst und dann
+# wiederverwendet: kein os.getenv, kein Header-Dict, kein neues Objekt pro Call.
+_GH_TOKEN: str | None = None
+_GH_INSTANCE: GitHubClient | None = None
 
 def _require_token() -> str:
-    token = os.getenv(GITHUB_TOKEN_ENV)
-    if not token:
-        raise RuntimeError(
-            f"Missing {GITHUB_TOKEN_ENV}. "
-            "Set a GitHub Personal Access Token with appropriate repo scope in your deployment environment."
-        )
-    return token
+    global _GH_TOKEN
+    if _GH_TOKEN is None:
+        token = os.getenv(GITHUB_TOKEN_ENV)
+        if not token:
+            raise RuntimeError(
+                f"Missing {GITHUB_TOKEN_ENV}. "
+                "Set a GitHub Personal Access Token with appropriate repo scope in your deployment environment."
+            )
+        _GH_TOKEN = token
+    return _GH_TOKEN
+
+def _gh() -> GitHubClient:
+    global _GH_INSTANCE
+    if _GH_INSTANCE is None:
+        _GH_INSTANCE = GitHubClient(_require_token())
+    return _GH_INSTANCE
 
 # ---- Tools: read / write single file ----
 
@@ -226,13 +305,17 @@ def _require_token() -> str:
     description=(
         "Liest eine Datei aus einem GitHub-Repository. "
         "Parameter: owner, repo, path, optional ref (Branch/Tag/SHA). "
-        "Gibt Base64-kodierte 'content' zurück, falls type='file'."
+        "Gibt Base64-kodierte 'content' zurück, falls type='file'. "
+        "Mit raw=True wird stattdessen 'raw_content' als Klartext über die Raw-URL geladen "
+        "(kein Base64-Overhead, funktioniert auch für Dateien >1 MB)."
     )
 )
-def github_read_file(owner: str, repo: str, path: str, ref: str | None = None) -> dict:
-    client = GitHubClient(_require_token())
-    data = client.get_content(owner, repo, path, ref=ref)
-    return {
+async def github_read_file(
+    owner: str, repo: str, path: str, ref: str | None = None, raw: bool = False
+) -> dict:
+    client = _gh()
+    data = await client.get_content(owner, repo, path, ref=ref)
+    result = {
         "type": data.get("type"),
         "name": data.get("name"),
         "path": data.get("path"),
@@ -244,6 +327,13 @@ def github_read_file(owner: str, repo: str, path: str, ref: str | None = None) -
         "html_url": data.get("html_url"),
         "_ref": ref,
     }
+    if raw and data.get("type") == "file" and data.get("download_url"):
+        # Raw-Endpunkt spart ~33% Transfervolumen (kein Base64) und umgeht
+        # die 1-MB-Grenze der Contents API (dort ist 'content' dann leer).
+        result["raw_content"] = await client.get_raw(data["download_url"])
+        result["content"] = None
+        result["encoding"] = None
+    return result
 
 @mcp.tool(
     description=(
@@ -252,7 +342,7 @@ def github_read_file(owner: str, repo: str, path: str, ref: str | None = None) -
         "Optional: branch, sha (zum Update bestehender Dateien), author/committer."
     )
 )
-def github_write_file(
+async def github_write_file(
     owner: str,
     repo: str,
     path: str,
@@ -265,10 +355,10 @@ def github_write_file(
     committer_name: str | None = None,
     committer_email: str | None = None,
 ) -> dict:
-    client = GitHubClient(_require_token())
+    client = _gh()
     author = {"name": author_name, "email": author_email} if author_name and author_email else None
     committer = {"name": committer_name, "email": committer_email} if committer_name and committer_email else None
-    data = client.put_content(
+    data = await client.put_content(
         owner=owner,
         repo=repo,
         path=path,
@@ -298,7 +388,7 @@ def github_write_file(
         "Wenn 'sha' fehlt, wird versucht, sie automatisch zu ermitteln."
     )
 )
-def github_delete_file(
+async def github_delete_file(
     owner: str,
     repo: str,
     path: str,
@@ -306,15 +396,18 @@ def github_delete_file(
     branch: str | None = None,
     sha: str | None = None,
 ) -> dict:
-    client = GitHubClient(_require_token())
+    client = _gh()
     use_sha = sha
     if not use_sha:
         try:
-            cur = client.get_content(owner, repo, path, ref=branch)
-            use_sha = cur.get("sha")
+            # HEAD statt vollem GET: spart den Download des Dateiinhalts.
+            use_sha = await client.get_blob_sha(owner, repo, path, ref=branch)
+            if not use_sha:
+                cur = await client.get_content(owner, repo, path, ref=branch)
+                use_sha = cur.get("sha")
         except httpx.HTTPStatusError as e:
             raise RuntimeError(f"Could not resolve sha for delete: {e.response.status_code} {e.response.text}")
-    data = client.delete_content(owner, repo, path, message=message, branch=branch, sha=use_sha)
+    data = await client.delete_content(owner, repo, path, message=message, branch=branch, sha=use_sha)
     commit = data.get("commit") or {}
     return {
         "deleted_path": path,
@@ -325,6 +418,10 @@ def github_delete_file(
 
 # ---- Tools: list directory & tree ----
 
+# Felder, die github_list_dir pro Eintrag zurückgibt; als Modul-Konstante,
+# damit der Listcomp unten ohne wiederholten Tupel-Aufbau auskommt.
+_LIST_DIR_KEYS = ("type", "name", "path", "sha", "size", "html_url", "download_url")
+
 @mcp.tool(
     description=(
         "Listet den Inhalt eines Verzeichnisses über die Contents API. "
@@ -332,43 +429,61 @@ def github_delete_file(
         "Gibt eine Liste aus Files/Dirs mit Typ, Pfad, Größe (bei Dateien)."
     )
 )
-def github_list_dir(owner: str, repo: str, path: str | None = "", ref: str | None = None) -> List[dict]:
-    client = GitHubClient(_require_token())
+async def github_list_dir(owner: str, repo: str, path: str | None = "", ref: str | None = None) -> List[dict]:
+    client = _gh()
     path_param = path or ""
-    data = client.get_content(owner, repo, path_param, ref=ref)
+    data = await client.get_content(owner, repo, path_param, ref=ref)
     items = data if isinstance(data, list) else [data]
-    result: List[dict] = []
-    for it in items:
-        result.append({
-            "type": it.get("type"),
-            "name": it.get("name"),
-            "path": it.get("path"),
-            "sha": it.get("sha"),
-            "size": it.get("size"),
-            "html_url": it.get("html_url"),
-            "download_url": it.get("download_url"),
-        })
-    return result
+    keys = _LIST_DIR_KEYS
+    return [{k: it.get(k) for k in keys} for it in items]
+
+def _filter_tree_entries(entries: List[dict], prefixes: tuple) -> List[dict]:
+    # Heißer Pfad bei 100k+ Einträgen: lokale Namen statt Global-Lookups,
+    # ein startswith(tuple)-Aufruf (C-Ebene) statt einer Schleife pro Präfix.
+    get = dict.get
+    return [e for e in entries if (p := get(e, "path", "")) and p.startswith(prefixes)]
 
 @mcp.tool(
     description=(
         "Listet den kompletten Git-Tree (rekursiv) über die Trees API. "
-        "Parameter: owner, repo, ref (Branch/Tag/SHA). Optional: recursive=True, path_prefix zum Filtern."
+        "Parameter: owner, repo, ref (Branch/Tag/SHA). Optional: recursive=True, "
+        "path_prefix (String oder Liste von Strings) zum Filtern."
     )
 )
-def github_list_tree(
+async def github_list_tree(
     owner: str,
     repo: str,
     ref: str,
     recursive: bool = True,
-    path_prefix: str | None = None,
+    path_prefix: str | List[str] | None = None,
 ) -> dict:
-    client = GitHubClient(_require_token())
-    tree = client.get_tree(owner, repo, ref, recursive=recursive)
-    entries = tree.get("tree", [])
+    client = _gh()
+    prefixes: tuple | None = None
     if path_prefix:
-        pref = path_prefix.rstrip("/") + "/"
-        entries = [e for e in entries if e.get("path", "").startswith(pref)]
+        raw = [path_prefix] if isinstance(path_prefix, str) else list(path_prefix)
+        prefixes = tuple(p.rstrip("/") + "/" for p in raw)
+    if prefixes is not None and len(prefixes) == 1 and recursive:
+        # Server-seitig vorfiltern: '{ref}:{pfad}' adressiert den Subtree direkt,
+        # GitHub liefert dann nur die Einträge unterhalb des Präfixes.
+        pref = prefixes[0]
+        try:
+            tree = await client.get_tree(owner, repo, f"{ref}:{pref.rstrip('/')}", recursive=True)
+        except httpx.HTTPStatusError:
+            tree = None  # Präfix ist kein Verzeichnis auf diesem Ref; voller Tree unten
+        if tree is not None:
+            entries = tree.get("tree", [])
+            for e in entries:
+                e["path"] = pref + e["path"]  # Subtree-Pfade wieder repo-relativ machen
+            return {
+                "truncated": tree.get("truncated"),
+                "sha": tree.get("sha"),
+                "count": len(entries),
+                "entries": entries,  # each: {path, mode, type, sha, size}
+            }
+    tree = await client.get_tree(owner, repo, ref, recursive=recursive)
+    entries = tree.get("tree", [])
+    if prefixes:
+        entries = _filter_tree_entries(entries, prefixes)
     return {
         "truncated": tree.get("truncated"),
         "sha": tree.get("sha"),
@@ -382,6 +497,18 @@ def github_list_tree(
 
 RENDER_DEPLOY_HOOK_ENV = "RENDER_DEPLOY_HOOK_URL"
 
+# Langlebiger Async-Client wie beim GitHub-Pool: wiederholte Deploy-Trigger im
+# selben Prozess sparen sich den TLS-Handshake zu api.render.com. Bewusst vom
+# GitHub-Client getrennt, damit dessen Authorization-Header (PAT) nie an
+# fremde Hosts geht.
+_RENDER_CLIENT = httpx.AsyncClient(
+    timeout=20.0,
+    follow_redirects=True,
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=4),
+)
+atexit.register(_close_async_client, _RENDER_CLIENT)
+
 def _resolve_render_webhook(full_url: str | None, service_id: str | None, key: str | None) -> str:
     """
     Liefert die endgültige Webhook-URL:
@@ -407,7 +534,7 @@ def _resolve_render_webhook(full_url: str | None, service_id: str | None, key: s
         "Parameter: full_url ODER (service_id + key). Fallback: ENV 'RENDER_DEPLOY_HOOK_URL'."
     )
 )
-def render_trigger_deploy(
+async def render_trigger_deploy(
     full_url: str | None = None,
     service_id: str | None = None,
     key: str | None = None,
@@ -422,13 +549,12 @@ def render_trigger_deploy(
     meth = (method or "POST").upper()
 
     try:
-        with httpx.Client(timeout=float(timeout_seconds), follow_redirects=True) as c:
-            if meth == "POST":
-                r = c.post(url, json={})
-            elif meth == "GET":
-                r = c.get(url)
-            else:
-                raise ValueError(f"Unsupported method: {meth} (verwende POST oder GET)")
+        if meth == "POST":
+            r = await _RENDER_CLIENT.post(url, json={}, timeout=float(timeout_seconds))
+        elif meth == "GET":
+            r = await _RENDER_CLIENT.get(url, timeout=float(timeout_seconds))
+        else:
+            raise ValueError(f"Unsupported method: {meth} (verwende POST oder GET)")
 
         try:
             body = r.json()
@@ -455,9 +581,15 @@ def render_trigger_deploy(
 # ASGI
 # =========================
 
-app = mcp.http_app()
+# App erst im Worker bauen (uvicorn main:create_app --factory bzw.
+# gunicorn "main:create_app()"): unter --preload + fork würden sonst alle
+# Prozesse Event-Loop-Ressourcen wie die Async-Client-Sockets teilen.
+app: object | None = None
 
 def create_app() -> object:
+    global app
+    if app is None:
+        app = mcp.http_app()
     return app
 
 if __name__ == "__main__":
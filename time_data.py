@@ -0,0 +1,147 @@
+# time_data.py
+"""Kanonische Stadt→Zeitzonen-Tabelle und Resolver, geteilt von allen Servervarianten."""
+from __future__ import annotations
+
+import sys
+from types import MappingProxyType
+from typing import Mapping, Optional, Dict
+from zoneinfo import ZoneInfo, available_timezones
+
+_CITY_TO_TZ_RAW: Dict[str, str] = {
+    # DACH
+    "berlin": "Europe/Berlin",
+    "münchen": "Europe/Berlin",
+    "munich": "Europe/Berlin",
+    "hamburg": "Europe/Berlin",
+    "köln": "Europe/Berlin",
+    "cologne": "Europe/Berlin",
+    "frankfurt": "Europe/Berlin",
+    "stuttgart": "Europe/Berlin",
+    "leipzig": "Europe/Berlin",
+    "dresden": "Europe/Berlin",
+    "zürich": "Europe/Zurich",
+    "zurich": "Europe/Zurich",
+    "wien": "Europe/Vienna",
+    "vienna": "Europe/Vienna",
+    # Europa
+    "madrid": "Europe/Madrid",
+    "barcelona": "Europe/Madrid",
+    "paris": "Europe/Paris",
+    "london": "Europe/London",
+    "dublin": "Europe/Dublin",
+    "lisbon": "Europe/Lisbon",
+    "roma": "Europe/Rome",
+    "rome": "Europe/Rome",
+    "milano": "Europe/Rome",
+    "milan": "Europe/Rome",
+    "prague": "Europe/Prague",
+    "praha": "Europe/Prague",
+    "budapest": "Europe/Budapest",
+    "warsaw": "Europe/Warsaw",
+    "moscow": "Europe/Moscow",
+    "moskau": "Europe/Moscow",
+    "st. petersburg": "Europe/Moscow",
+    "istanbul": "Europe/Istanbul",
+    "athens": "Europe/Athens",
+    "oslo": "Europe/Oslo",
+    "stockholm": "Europe/Stockholm",
+    "helsinki": "Europe/Helsinki",
+    # Nordamerika
+    "new york": "America/New_York",
+    "nyc": "America/New_York",
+    "chicago": "America/Chicago",
+    "denver": "America/Denver",
+    "los angeles": "America/Los_Angeles",
+    "la": "America/Los_Angeles",
+    "san francisco": "America/Los_Angeles",
+    "toronto": "America/Toronto",
+    "mexico city": "America/Mexico_City",
+    # Südamerika
+    "são paulo": "America/Sao_Paulo",
+    "sao paulo": "America/Sao_Paulo",
+    "buenos aires": "America/Argentina/Buenos_Aires",
+    "santiago": "America/Santiago",
+    "bogotá": "America/Bogota",
+    "bogota": "America/Bogota",
+    "lima": "America/Lima",
+    # Asien
+    "tokyo": "Asia/Tokyo",
+    "seoul": "Asia/Seoul",
+    "shanghai": "Asia/Shanghai",
+    "beijing": "Asia/Shanghai",
+    "hong kong": "Asia/Hong_Kong",
+    "singapore": "Asia/Singapore",
+    "kolkata": "Asia/Kolkata",
+    "mumbai": "Asia/Kolkata",
+    "delhi": "Asia/Kolkata",
+    "dubai": "Asia/Dubai",
+    "abu dhabi": "Asia/Dubai",
+    # Ozeanien / Afrika
+    "sydney": "Australia/Sydney",
+    "melbourne": "Australia/Melbourne",
+    "auckland": "Pacific/Auckland",
+    "cairo": "Africa/Cairo",
+    "johannesburg": "Africa/Johannesburg",
+    "nairobi": "Africa/Nairobi",
+}
+
+# Schreibgeschützte Sicht, damit Importeure die kanonische Tabelle nicht mutieren.
+CITY_TO_TZ: Mapping[str, str] = MappingProxyType(_CITY_TO_TZ_RAW)
+
+# Eine C-Pass-Übersetzung statt dreier replace()-Aufrufe; Punkte fallen weg,
+# sodass "St. Petersburg" und "st petersburg" auf denselben Schlüssel normalisieren.
+_TRANS = str.maketrans({"_": " ", "-": " ", ".": ""})
+
+def _normalize_key(s: str) -> str:
+    return s.casefold().translate(_TRANS).strip()
+
+# Jede referenzierte IANA-Zone genau einmal beim Import laden (Dateizugriff +
+# tzdata-Parsen); das wärmt den zoneinfo-Cache vor, sodass kein Request die
+# First-Call-Latenz einer kalten Zone zahlt.
+_ZONES: Dict[str, ZoneInfo] = {name: ZoneInfo(name) for name in set(CITY_TO_TZ.values())}
+
+def _build_city_to_zi() -> Mapping[str, ZoneInfo]:
+    # Tabellenschlüssel durchlaufen dieselbe Normalisierung wie Nutzereingaben,
+    # damit ein dict.get genügt; Städte derselben Zone teilen sich die Instanz.
+    # Interning der Schlüssel lässt Lookups mit ebenfalls internten Strings
+    # den Identitätsvergleich in CPythons dict-Lookup treffen.
+    return MappingProxyType({sys.intern(_normalize_key(k)): _ZONES[v] for k, v in CITY_TO_TZ.items()})
+
+CITY_TO_ZI: Mapping[str, ZoneInfo] = _build_city_to_zi()
+
+_UTC_ZI = ZoneInfo("UTC")
+# Mit den vorgewärmten Zonen vorbesetzt: timezone_name-Lookups auf Tabellenzonen
+# treffen sofort den Cache.
+_IANA_ZI_CACHE: Dict[str, ZoneInfo] = dict(_ZONES)
+_AVAILABLE_TZ: Optional[frozenset] = None
+
+def _available_tz() -> frozenset:
+    # Lazy, weil available_timezones() die tzdata-Verzeichnisse scannt;
+    # danach kostet der Gültigkeits-Check nur noch einen Set-Lookup.
+    global _AVAILABLE_TZ
+    if _AVAILABLE_TZ is None:
+        _AVAILABLE_TZ = frozenset(available_timezones())
+    return _AVAILABLE_TZ
+
+def _resolve_by_tz(timezone_name: str) -> Optional[ZoneInfo]:
+    zi = _IANA_ZI_CACHE.get(timezone_name)
+    if zi is not None:
+        return zi
+    # Set-Check statt try/except: ungültige Namen bauen kein Exception-Objekt.
+    if timezone_name in _available_tz():
+        return _IANA_ZI_CACHE.setdefault(timezone_name, ZoneInfo(timezone_name))
+    return None
+
+def _resolve_by_city(city: str) -> Optional[ZoneInfo]:
+    return CITY_TO_ZI.get(sys.intern(_normalize_key(city)))
+
+def _resolve_timezone(timezone_name: Optional[str] = None, city: Optional[str] = None) -> ZoneInfo:
+    if timezone_name:
+        zi = _resolve_by_tz(timezone_name)
+        if zi is not None:
+            return zi
+    if city:
+        zi = _resolve_by_city(city)
+        if zi is not None:
+            return zi
+    return _UTC_ZI